@@ -0,0 +1,455 @@
+"""
+Offline load-test harness for the TruCred Streamlit apps.
+
+Drives N concurrent applicant sessions of app.py and M admin sessions of
+admin.py through Streamlit's AppTest, so every step is a real script rerun:
+proofs are uploaded, a UPI CSV is analysed, an admin verifies the documents,
+and the applicant generates and downloads the PDF report.
+
+AppTest installs a process-wide runtime for the duration of each rerun, so
+reruns are serialised behind a lock. Reruns are GIL-bound Python work, which
+makes this a close model of one Streamlit worker. Each step reports the time
+spent queued for the lock and the time spent inside the rerun, as well as
+their end-to-end total. Use --ramp and --think-time to find the concurrency
+at which latency starts to degrade instead of measuring a single burst.
+
+admin.py saves every status selectbox on its page, so two admins with the
+dashboard open overwrite each other's verifications. By default admins take
+turns and reopen the dashboard for each review; --racing-admins keeps one
+dashboard open per admin to reproduce the overwrite. Sessions left pending
+by it are reported separately and excluded from throughput and latency.
+
+Usage:
+    python load_test.py --applicants 20 --admins 2 --ramp 10 --think-time 1
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import date
+
+from streamlit.testing.v1 import AppTest
+
+from upi_parser import analyze_upi_csv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_SCRIPT = os.path.join(BASE_DIR, "app.py")
+ADMIN_SCRIPT = os.path.join(BASE_DIR, "admin.py")
+
+STEPS = [
+    "load_app",
+    "select_options",
+    "upload_proofs",
+    "upload_upi",
+    "submit",
+    "admin_review",
+    "admin_verify",
+    "generate_pdf",
+]
+
+# Steps that open a page; every other step follows a user interaction and gets think time
+PAGE_LOADS = {"load_app", "admin_review"}
+
+# AppTest swaps streamlit's Runtime singleton on every run, so only one may run at a time
+RUN_LOCK = threading.Lock()
+
+# admin.py writes every open status selectbox back on save, so two dashboards open at
+# once overwrite each other's verifications; admins take turns unless --racing-admins
+ADMIN_LOCK = threading.Lock()
+
+PROOF_LABELS = {
+    "Rent Proofs": "Upload Proof (PDF/JPG/PNG)",
+    "Mobile Recharge Proofs": "Upload Recharge Proof",
+    "Utility Bill Proofs": "Upload Utility Bill",
+}
+
+# Must match what app.py writes and offers for download
+REPORT_PATH = "financial_report.pdf"
+REPORT_FILE_NAME = "TruCred_Financial_Report.pdf"
+
+
+class SessionFailed(Exception):
+    pass
+
+
+class VerificationPending(SessionFailed):
+    pass
+
+
+class Metrics:
+    """
+    Thread-safe collector of per-step latencies and session outcomes.
+    Only successful reruns contribute latency samples; failed ones are counted.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {step: {"wait": [], "run": [], "total": []} for step in STEPS}
+        self.failed_reruns = {step: 0 for step in STEPS}
+        self.completed = 0
+        self.pending = []
+        self.failures = []
+
+    def record(self, step, wait, run):
+        with self.lock:
+            samples = self.samples[step]
+            samples["wait"].append(wait)
+            samples["run"].append(run)
+            samples["total"].append(wait + run)
+
+    def record_failure(self, step):
+        with self.lock:
+            self.failed_reruns[step] += 1
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        # resource is Unix-only
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return peak / divisor
+
+
+def build_upi_csv(rows):
+    """
+    Synthetic UPI statement spanning six months with rent, utility and mobile payments.
+    """
+    descriptions = [
+        "Rent to landlord",
+        "Electricity bill",
+        "Jio recharge",
+        "Swiggy order",
+        "Amazon purchase",
+        "PhonePe transfer",
+    ]
+    lines = ["Date,Description,Amount"]
+    # Cycle every description through each month so each category recurs in all six
+    for i in range(max(rows, len(descriptions) * 6)):
+        month = i // len(descriptions) % 6 + 1
+        day = i // (len(descriptions) * 6) % 28 + 1
+        lines.append(f"{date(2025, month, day).isoformat()},{descriptions[i % len(descriptions)]},{100 + i % 900}")
+    return "\n".join(lines).encode("utf-8")
+
+
+def by_label(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise SessionFailed(f"Widget not found: {label}")
+
+
+def check_submit(at):
+    if at.error:
+        raise SessionFailed(f"submit: {at.error[0].value}")
+
+
+def check_download(at):
+    """
+    The report download must serve the PDF app.py just wrote, under the report file name.
+    Runs under RUN_LOCK, so no other session can have overwritten the shared report yet.
+    """
+    buttons = at.get("download_button")
+    if not buttons:
+        raise VerificationPending("generate_pdf: documents still pending after admin verification")
+
+    url = buttons[0].proto.url
+    if not url:
+        raise SessionFailed("generate_pdf: download button has no media URL")
+
+    with open(REPORT_PATH, "rb") as f:
+        pdf = f.read()
+    if not pdf.startswith(b"%PDF"):
+        raise SessionFailed(f"generate_pdf: {REPORT_PATH} is empty or not a PDF")
+
+    # Streamlit's media URL is derived from the bytes, mime type and download file name,
+    # so a reference button built from the report on disk must get the same URL
+    reference = AppTest.from_function(reference_download, args=(pdf, REPORT_FILE_NAME))
+    reference.run()
+    if url != reference.get("download_button")[0].proto.url:
+        raise SessionFailed(f"generate_pdf: download does not serve {REPORT_PATH} as {REPORT_FILE_NAME}")
+
+
+def reference_download(pdf, file_name):
+    import streamlit as st
+
+    st.download_button("Download", data=pdf, file_name=file_name, mime="application/pdf")
+
+
+def prepare_workdir():
+    """
+    Isolated working directory so the run never touches real uploads or statuses.
+    """
+    workdir = tempfile.mkdtemp(prefix="trucred_load_")
+    shutil.copytree(os.path.join(BASE_DIR, "assets"), os.path.join(workdir, "assets"))
+    return workdir
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.metrics = Metrics()
+        self.admin_pool = None
+        self.admin_sessions = threading.local()
+        with open(os.path.join(BASE_DIR, "assets", "logo.png"), "rb") as f:
+            self.proof_bytes = f.read()
+        self.upi_bytes = build_upi_csv(args.upi_rows)
+        # Every applicant should reach scoring on the consistent-spending path
+        if not analyze_upi_csv(io.BytesIO(self.upi_bytes)):
+            raise RuntimeError("Synthetic UPI CSV does not show consistent spending")
+
+    @property
+    def total_sessions(self):
+        return self.args.sessions or self.args.applicants
+
+    def rerun(self, step, at, check=None):
+        """
+        Rerun the script for one step, recording queue wait and rerun time separately.
+        """
+        if step not in PAGE_LOADS and self.args.think_time:
+            time.sleep(self.args.think_time)
+
+        queued = time.perf_counter()
+        with RUN_LOCK:
+            started = time.perf_counter()
+            at.run()
+            finished = time.perf_counter()
+            try:
+                if at.exception:
+                    raise SessionFailed(f"{step}: {at.exception[0].message}")
+                if check:
+                    check(at)
+            except SessionFailed:
+                self.metrics.record_failure(step)
+                raise
+        self.metrics.record(step, started - queued, finished - started)
+        return at
+
+    def admin_session(self):
+        """
+        A fresh dashboard per review, like an admin reopening admin.py. With
+        --racing-admins each admin thread keeps one session open instead.
+        """
+        if not self.args.racing_admins:
+            return AppTest.from_file(ADMIN_SCRIPT, default_timeout=self.args.timeout)
+        at = getattr(self.admin_sessions, "at", None)
+        if at is None:
+            at = AppTest.from_file(ADMIN_SCRIPT, default_timeout=self.args.timeout)
+            self.admin_sessions.at = at
+        return at
+
+    def admin_verify(self, keys):
+        """
+        Runs on an admin worker: review admin.py and mark the given documents Verified.
+        """
+        with nullcontext() if self.args.racing_admins else ADMIN_LOCK:
+            at = self.admin_session()
+            self.rerun("admin_review", at)
+
+            for key in keys:
+                at.selectbox(key=f"status_select_{key}").set_value("Verified")
+            self.rerun("admin_verify", at)
+
+    def applicant_session(self, index):
+        name = f"loadtest-{index:04d}"
+        at = AppTest.from_file(APP_SCRIPT, default_timeout=self.args.timeout)
+        self.rerun("load_app", at)
+
+        by_label(at.radio, "Do you recharge your mobile regularly?").set_value("Yes")
+        by_label(at.radio, "Do you have any utility bills in your name?").set_value("Yes")
+        self.rerun("select_options", at)
+
+        for doc_type, label in PROOF_LABELS.items():
+            by_label(at.file_uploader, label).set_value((f"{doc_type.split()[0].lower()}.png", self.proof_bytes, "image/png"))
+        self.rerun("upload_proofs", at)
+
+        by_label(at.file_uploader, "Upload UPI CSV File").set_value(("upi.csv", self.upi_bytes, "text/csv"))
+        self.rerun("upload_upi", at)
+
+        by_label(at.text_input, "Full Name").input(name)
+        by_label(at.text_input, "Email Address").input(f"{name}@example.com")
+        by_label(at.text_input, "Phone Number").input("9876543210")
+        by_label(at.slider, "Months of timely payments").set_value(6)
+        by_label(at.text_input, "Reference Name").input("Load Tester")
+        by_label(at.text_input, "Relationship").input("Colleague")
+        by_label(at.button, "Generate Trust Score and PDF Report").click()
+        self.rerun("submit", at, check_submit)
+
+        keys = [f"{doc_type}_{name}_{doc_type.split()[0].lower()}.png" for doc_type in PROOF_LABELS]
+        self.admin_pool.submit(self.admin_verify, keys).result()
+
+        by_label(at.button, "Refresh Status").click()
+        self.rerun("generate_pdf", at, check_download)
+
+    def run_session(self, index, start):
+        # Spread session starts evenly over the ramp-up period
+        delay = start + index * self.args.ramp / self.total_sessions - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            self.applicant_session(index)
+            with self.metrics.lock:
+                self.metrics.completed += 1
+        except VerificationPending as e:
+            with self.metrics.lock:
+                self.metrics.pending.append(f"session {index}: {e}")
+        except Exception as e:
+            with self.metrics.lock:
+                self.metrics.failures.append(f"session {index}: {e}")
+
+    def run(self):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.admins, thread_name_prefix="admin") as self.admin_pool, \
+                ThreadPoolExecutor(max_workers=self.args.applicants, thread_name_prefix="applicant") as pool:
+            list(pool.map(lambda index: self.run_session(index, start), range(self.total_sessions)))
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        metrics = self.metrics
+        reruns = sum(len(samples["total"]) for samples in metrics.samples.values())
+        steps = {}
+        for step, samples in metrics.samples.items():
+            steps[step] = {"count": len(samples["total"]), "failed": metrics.failed_reruns[step]}
+            for kind, values in samples.items():
+                steps[step][f"{kind}_ms"] = {}
+                for pct in (50, 95, 99):
+                    value = percentile(values, pct)
+                    steps[step][f"{kind}_ms"][f"p{pct}"] = None if value is None else round(value * 1000, 1)
+        peak_rss = peak_rss_mb()
+        return {
+            "applicants": self.args.applicants,
+            "admins": self.args.admins,
+            "racing_admins": self.args.racing_admins,
+            "sessions": self.total_sessions,
+            "ramp_seconds": self.args.ramp,
+            "think_time_seconds": self.args.think_time,
+            "completed": metrics.completed,
+            "pending_after_verification": len(metrics.pending),
+            "failed": len(metrics.failures),
+            "wall_seconds": round(elapsed, 2),
+            "sessions_per_second": round(metrics.completed / elapsed, 3),
+            "reruns_per_second": round(reruns / elapsed, 2),
+            "peak_rss_mb": None if peak_rss is None else round(peak_rss, 1),
+            "steps": steps,
+            "pending": metrics.pending,
+            "failures": metrics.failures,
+        }
+
+
+def print_report(report):
+    peak_rss = "n/a" if report["peak_rss_mb"] is None else f"{report['peak_rss_mb']} MB"
+    admin_mode = "racing" if report["racing_admins"] else "taking turns"
+    print(f"Applicants: {report['applicants']} concurrent, {report['sessions']} sessions | "
+          f"Admins: {report['admins']} ({admin_mode})")
+    print(f"Ramp-up: {report['ramp_seconds']}s | Think time: {report['think_time_seconds']}s")
+    print(f"Completed: {report['completed']} | Pending after verification: {report['pending_after_verification']} | "
+          f"Failed: {report['failed']} | Wall time: {report['wall_seconds']}s")
+    print(f"Throughput: {report['sessions_per_second']} sessions/s, {report['reruns_per_second']} reruns/s")
+    print(f"Peak RSS: {peak_rss}")
+    print()
+    print("Latency in ms; total = queue wait + rerun. Failed reruns are excluded.")
+    columns = [("total_ms", "p50"), ("total_ms", "p95"), ("total_ms", "p99"),
+               ("run_ms", "p50"), ("run_ms", "p95"), ("wait_ms", "p95")]
+    header = "".join(f"{kind.split('_')[0] + ' ' + pct:>12}" for kind, pct in columns)
+    print(f"{'Step':<16}{'Count':>7}{'Failed':>8}{header}")
+    for step, stats in report["steps"].items():
+        cells = "".join(f"{'-' if stats[kind][pct] is None else stats[kind][pct]:>12}" for kind, pct in columns)
+        print(f"{step:<16}{stats['count']:>7}{stats['failed']:>8}{cells}")
+    for pending in report["pending"]:
+        print(f"PENDING {pending}")
+    for failure in report["failures"]:
+        print(f"FAILED {failure}")
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {value}")
+    return number
+
+
+def non_negative_float(value):
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {value}")
+    return number
+
+
+def positive_float(value):
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the TruCred Streamlit apps.")
+    parser.add_argument("--applicants", type=positive_int, default=10, help="Concurrent applicant sessions")
+    parser.add_argument("--sessions", type=non_negative_int, default=0, help="Total applicant sessions (defaults to --applicants)")
+    parser.add_argument("--admins", type=positive_int, default=1, help="Concurrent admin sessions")
+    parser.add_argument("--racing-admins", action="store_true",
+                        help="Keep one dashboard open per admin and let admins save concurrently; "
+                             "reproduces verifications being overwritten")
+    parser.add_argument("--ramp", type=non_negative_float, default=0, help="Seconds over which to spread session starts")
+    parser.add_argument("--think-time", type=non_negative_float, default=0, help="Seconds a user pauses before each interaction")
+    parser.add_argument("--upi-rows", type=positive_int, default=500, help="Rows in the synthetic UPI CSV")
+    parser.add_argument("--timeout", type=positive_float, default=60, help="Seconds allowed per script rerun")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--keep-workdir", action="store_true", help="Keep the temporary working directory")
+    args = parser.parse_args()
+
+    # Worker threads have no ScriptRunContext outside a rerun; the warning is expected here
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        lambda record: "missing ScriptRunContext" not in record.getMessage()
+    )
+
+    workdir = prepare_workdir()
+    os.chdir(workdir)
+    try:
+        report = LoadTest(args).run()
+    finally:
+        os.chdir(BASE_DIR)
+        if args.keep_workdir:
+            print(f"Working directory kept at {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()